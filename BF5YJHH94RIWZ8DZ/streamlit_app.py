@@ -2,14 +2,41 @@
 # STOCK HEALTH MONITOR - With Add/Edit/Delete
 # ========================================
 
+import io
+
 import streamlit as st
 import pandas as pd
+import numpy as np
+import pyarrow as pa
 from snowflake.snowpark.context import get_active_session
-from datetime import date
 
 # Get Snowflake session
 session = get_active_session()
 
+# ========================================
+# HELPERS
+# ========================================
+def fetch_df(query, params=None):
+    """Run a read query and build the DataFrame from streamed Arrow batches."""
+    cursor = session.connection.cursor()
+    try:
+        cursor.execute(query, params)
+        batches = list(cursor.fetch_arrow_batches())
+        columns = [col.name for col in cursor.description]
+    finally:
+        cursor.close()
+    if not batches:
+        return pd.DataFrame(columns=columns)
+    return pa.concat_tables(batches).to_pandas(self_destruct=True, split_blocks=True)
+
+
+@st.cache_data
+def _to_csv_bytes(df):
+    """Serialize a frame to CSV bytes once per distinct frame."""
+    buf = io.BytesIO()
+    df.to_csv(buf, index=False)
+    return buf.getvalue()
+
 # ========================================
 # PAGE CONFIGURATION
 # ========================================
@@ -19,6 +46,81 @@ st.set_page_config(
     layout="wide"
 )
 
+# ========================================
+# CUSTOM UI STYLING
+# ========================================
+# Injected before any page content so styling is in place at first paint
+st.markdown("""
+<style>
+
+/* ---- MAIN APP BACKGROUND ---- */
+.stApp {
+    background-color: #f6f8fb;
+    color: #1f2933;
+}
+
+/* ---- SIDEBAR ---- */
+[data-testid="stSidebar"] {
+    background-color: #1e293b;
+    color: white;
+}
+
+[data-testid="stSidebar"] h1,
+[data-testid="stSidebar"] h2,
+[data-testid="stSidebar"] h3,
+[data-testid="stSidebar"] p,
+[data-testid="stSidebar"] label {
+    color: #ffffff !important;
+}
+
+/* ---- HEADINGS ---- */
+h1 {
+    color: #1e3a8a;
+    font-weight: 700;
+}
+h2 {
+    color: #1d4ed8;
+}
+h3 {
+    color: #2563eb;
+}
+
+/* ---- METRIC CARDS ---- */
+[data-testid="stMetric"] {
+    background-color: #ffffff;
+    padding: 12px;
+    border-radius: 10px;
+    box-shadow: 0px 2px 6px rgba(0,0,0,0.08);
+}
+
+/* ---- DATAFRAMES ---- */
+.stDataFrame {
+    background-color: white;
+    border-radius: 8px;
+}
+
+/* ---- BUTTONS ---- */
+.stButton>button {
+    background-color: #2563eb;
+    color: white;
+    border-radius: 8px;
+    padding: 0.6rem 1.2rem;
+    font-weight: 600;
+    border: none;
+}
+
+.stButton>button:hover {
+    background-color: #1d4ed8;
+}
+
+/* ---- SUCCESS / ERROR BOXES ---- */
+.stAlert {
+    border-radius: 8px;
+}
+
+</style>
+""", unsafe_allow_html=True)
+
 # ========================================
 # SIDEBAR NAVIGATION
 # ========================================
@@ -43,59 +145,113 @@ if page == "📊 Dashboard":
     st.markdown("---")
     
     # LOAD DATA
-    @st.cache_data(ttl=600)
-    def load_data():
-        
-        query = """
-        SELECT 
+    # Cheap metadata probe: MAX(date) is answered from micro-partition stats and
+    # the last-change commit time moves on every write or dynamic table refresh,
+    # so the loaders below (keyed on both) only re-run when the data changed.
+    @st.cache_data(ttl=30)
+    def _latest_snapshot():
+        return tuple(session.sql("""
+        SELECT MAX(date), SYSTEM$LAST_CHANGE_COMMIT_TIME('stock_health_metrics')
+        FROM stock_health_metrics
+        """).collect()[0])
+    
+    # Days-until-stockout and status are derived in Snowflake so Python
+    # receives final columns and does no per-row work. The snapshot date is
+    # bound from _latest_snapshot() rather than re-scanned with a MAX(date)
+    # subquery; with `ALTER TABLE stock_health_metrics CLUSTER BY (date)`
+    # Snowflake prunes the scan to that single day's micro-partitions.
+    LATEST_METRICS_SQL = """
+        SELECT
             location, item, date, closing_stock, issued, avg_daily_usage,
-            days_until_stockout, stock_status, suggested_reorder_qty,
+            days_until_stockout,
+            CASE
+                WHEN days_until_stockout <= 2 THEN 'CRITICAL'
+                WHEN days_until_stockout <= 5 THEN 'WARNING'
+                WHEN days_until_stockout <= 10 THEN 'HEALTHY'
+                ELSE 'OVERSTOCK'
+            END AS stock_status,
+            suggested_reorder_qty, lead_time_days, reorder_level
+        FROM (
+            SELECT
+                location, item, date, closing_stock, issued, avg_daily_usage,
+                ROUND(closing_stock / IFF(avg_daily_usage = 0, 0.01, avg_daily_usage), 1) AS days_until_stockout,
+                suggested_reorder_qty, lead_time_days, reorder_level
+            FROM stock_health_metrics
+            WHERE date = ?
+        )
+    """
+    
+    # Summary counts are aggregated in Snowflake instead of downloading rows
+    @st.cache_data(ttl=3600)
+    def load_status_counts(latest_date, changed_at):
+        
+        query = f"""
+        SELECT stock_status, COUNT(*) AS item_count
+        FROM ({LATEST_METRICS_SQL})
+        GROUP BY stock_status
+        """
+        counts_df = fetch_df(query, [latest_date])
+        return dict(zip(counts_df['STOCK_STATUS'], counts_df['ITEM_COUNT'].astype(int)))
+    
+    # Only rows that need attention (alerts or reorders) leave the warehouse
+    @st.cache_data(ttl=3600)
+    def load_alerts(latest_date, changed_at):
+        
+        # Quantities are truncated to integers in SQL (as int() did per row);
+        # the Int64 cast below only keeps NULLs from turning the column float
+        query = f"""
+        SELECT
+            location, item, date,
+            TRUNC(closing_stock)::INTEGER AS closing_stock,
+            issued, avg_daily_usage, days_until_stockout, stock_status,
+            TRUNC(suggested_reorder_qty)::INTEGER AS suggested_reorder_qty,
+            suggested_reorder_qty > 0 AS needs_reorder,
             lead_time_days, reorder_level
-        FROM stock_health_metrics
-        WHERE date = (SELECT MAX(date) FROM stock_health_metrics)
+        FROM ({LATEST_METRICS_SQL})
+        WHERE stock_status IN ('CRITICAL', 'WARNING') OR suggested_reorder_qty > 0
+        ORDER BY days_until_stockout
+        """
+        return fetch_df(query, [latest_date]).astype({
+            'CLOSING_STOCK': 'Int64', 'SUGGESTED_REORDER_QTY': 'Int64'
+        })
+    
+    # Heatmap is pivoted by Snowflake; Python only receives the wide frame
+    @st.cache_data(ttl=3600)
+    def load_heatmap(latest_date, changed_at):
+        
+        query = f"""
+        SELECT * FROM (
+            SELECT item, location, days_until_stockout
+            FROM ({LATEST_METRICS_SQL})
+        )
+        PIVOT (AVG(days_until_stockout) FOR location IN (ANY ORDER BY location))
+        ORDER BY item
         """
-        return session.sql(query).to_pandas()
+        heatmap = fetch_df(query, [latest_date]).set_index('ITEM')
+        # PIVOT ... ANY quotes the generated column names ('Hospital_Mumbai')
+        heatmap.columns = pd.Index([c.strip("'") for c in heatmap.columns], name='LOCATION')
+        return heatmap
     
     with st.spinner("📊 Loading stock data..."):
-        df = load_data()
-        # ===============================
-# FIX STOCK STATUS CALCULATION
-# ===============================
-
-# Prevent division by zero
-    df["AVG_DAILY_USAGE"] = df["AVG_DAILY_USAGE"].replace(0, 0.01)
-
-# Calculate days until stockout
-    df["DAYS_UNTIL_STOCKOUT"] = (df["CLOSING_STOCK"] / df["AVG_DAILY_USAGE"]).round(1)
-
-# Assign stock status correctly
-    def classify_stock(row):
-        if row["DAYS_UNTIL_STOCKOUT"] <= 2:
-            return "CRITICAL"
-        elif row["DAYS_UNTIL_STOCKOUT"] <= 5:
-            return "WARNING"
-        elif row["DAYS_UNTIL_STOCKOUT"] <= 10:
-            return "HEALTHY"
-        else:
-            return "OVERSTOCK"
-
-    df["STOCK_STATUS"] = df.apply(classify_stock, axis=1)
-
+        latest_date, changed_at = _latest_snapshot()
+        counts = load_status_counts(latest_date, changed_at)
+        heatmap_data = load_heatmap(latest_date, changed_at)
+        actions_df = load_alerts(latest_date, changed_at)
     
-    if df.empty:
+    if not counts:
         st.error("⚠️ No data found! Make sure stock_health_metrics table exists.")
         st.stop()
     
-    st.success(f"✅ Data loaded: {len(df)} items across {df['LOCATION'].nunique()} locations")
+    st.success(f"✅ Data loaded: {sum(counts.values())} items across {heatmap_data.shape[1]} locations")
     
     # TOP METRICS
     st.markdown("## 📈 Key Metrics")
     col1, col2, col3, col4 = st.columns(4)
     
-    critical_count = len(df[df['STOCK_STATUS'] == 'CRITICAL'])
-    warning_count = len(df[df['STOCK_STATUS'] == 'WARNING'])
-    healthy_count = len(df[df['STOCK_STATUS'] == 'HEALTHY'])
-    overstock_count = len(df[df['STOCK_STATUS'] == 'OVERSTOCK'])
+    critical_count = counts.get('CRITICAL', 0)
+    warning_count = counts.get('WARNING', 0)
+    healthy_count = counts.get('HEALTHY', 0)
+    overstock_count = counts.get('OVERSTOCK', 0)
     
     col1.metric("🚨 Critical Items", critical_count, delta=f"{critical_count} urgent", delta_color="inverse")
     col2.metric("⚠️ Warning Items", warning_count)
@@ -104,70 +260,98 @@ if page == "📊 Dashboard":
     
     st.markdown("---")
     
+    # Above these sizes Styler's per-cell CSS dominates render time
+    STYLER_MAX_ROWS = 200
+    STYLER_MAX_CELLS = 2000
+    
     # HEATMAP
     st.markdown("## 🗺️ Stock Status Heatmap")
     st.markdown("*Days until stockout by location and item*")
     
-    heatmap_data = df.pivot_table(
-        index='ITEM', columns='LOCATION', values='DAYS_UNTIL_STOCKOUT', aggfunc='mean'
-    )
-    
-    def color_days(val):
-        if pd.isna(val):
-            return ''
-        elif val <= 2:
-            return 'background-color: #ff6b6b; color: white; font-weight: bold'
-        elif val <= 5:
-            return 'background-color: #feca57; color: black; font-weight: bold'
-        elif val <= 10:
-            return 'background-color: #48dbfb; color: black'
-        else:
-            return 'background-color: #1dd1a1; color: white'
-    
-    styled_heatmap = heatmap_data.style.applymap(color_days).format("{:.1f}")
-    st.dataframe(styled_heatmap, use_container_width=True, height=400)
-    
-    st.markdown("""
-    **Color Legend:**
-    - 🔴 **Red (0-2 days)**: Critical - Immediate action needed
-    - 🟡 **Yellow (3-5 days)**: Warning - Order soon
-    - 🔵 **Blue (6-10 days)**: Adequate - Monitor
-    - 🟢 **Green (11+ days)**: Healthy stock levels
-    """)
+    if heatmap_data.size < STYLER_MAX_CELLS:
+        # Build the whole cell-style matrix at once instead of styling per cell
+        heatmap_colors = pd.DataFrame(
+            np.select(
+                [heatmap_data <= 2, heatmap_data <= 5, heatmap_data <= 10],
+                ['background-color: #ff6b6b; color: white; font-weight: bold',
+                 'background-color: #feca57; color: black; font-weight: bold',
+                 'background-color: #48dbfb; color: black'],
+                default='background-color: #1dd1a1; color: white'
+            ),
+            index=heatmap_data.index, columns=heatmap_data.columns
+        ).where(heatmap_data.notna(), '')
+        
+        styled_heatmap = heatmap_data.style.apply(lambda _: heatmap_colors, axis=None).format("{:.1f}")
+        st.dataframe(styled_heatmap, use_container_width=True, height=400)
+        
+        st.markdown("""
+        **Color Legend:**
+        - 🔴 **Red (0-2 days)**: Critical - Immediate action needed
+        - 🟡 **Yellow (3-5 days)**: Warning - Order soon
+        - 🔵 **Blue (6-10 days)**: Adequate - Monitor
+        - 🟢 **Green (11+ days)**: Healthy stock levels
+        """)
+    else:
+        # Too many cells to serialize per-cell CSS; send the raw frame
+        st.dataframe(
+            heatmap_data, use_container_width=True, height=400,
+            column_config={
+                loc: st.column_config.NumberColumn(format="%.1f")
+                for loc in heatmap_data.columns
+            }
+        )
     
     st.markdown("---")
     
     # CRITICAL ALERTS
     st.markdown("## 🚨 Critical & Warning Alerts")
     
-    alerts_df = df[df['STOCK_STATUS'].isin(['CRITICAL', 'WARNING'])].copy()
-    alerts_df = alerts_df.sort_values('DAYS_UNTIL_STOCKOUT')
+    # Already sorted by Snowflake; alerts and reorder lists are read-only slices
+    alerts_mask = actions_df['STOCK_STATUS'].isin(['CRITICAL', 'WARNING'])
+    reorder_mask = actions_df['NEEDS_REORDER']
+    
+    alerts_df = actions_df[alerts_mask]
     
     if len(alerts_df) > 0:
-        def highlight_status(row):
-            if row['STOCK_STATUS'] == 'CRITICAL':
-                return ['background-color: #ffcdd2'] * len(row)
-            elif row['STOCK_STATUS'] == 'WARNING':
-                return ['background-color: #fff9c4'] * len(row)
-            return [''] * len(row)
-        
         display_cols = ['LOCATION', 'ITEM', 'CLOSING_STOCK', 'AVG_DAILY_USAGE',
                        'DAYS_UNTIL_STOCKOUT', 'STOCK_STATUS', 'SUGGESTED_REORDER_QTY']
         
-        styled_alerts = alerts_df[display_cols].style.apply(highlight_status, axis=1)
-        st.dataframe(styled_alerts, use_container_width=True, height=400)
+        if len(alerts_df) <= STYLER_MAX_ROWS:
+            # One colour per row, broadcast across all displayed columns
+            row_colors = np.where(
+                alerts_df['STOCK_STATUS'] == 'CRITICAL', 'background-color: #ffcdd2',
+                np.where(alerts_df['STOCK_STATUS'] == 'WARNING', 'background-color: #fff9c4', '')
+            )
+            alert_styles = pd.DataFrame(
+                np.repeat(row_colors[:, None], len(display_cols), axis=1),
+                index=alerts_df.index, columns=display_cols
+            )
+            
+            styled_alerts = alerts_df[display_cols].style.apply(lambda _: alert_styles, axis=None)
+            st.dataframe(styled_alerts, use_container_width=True, height=400)
+        else:
+            # Large lists skip the Styler; the progress bar shows urgency client-side,
+            # scaled to the WARNING threshold since alerts never exceed 5 days
+            st.dataframe(
+                alerts_df[display_cols], use_container_width=True, height=400,
+                column_config={
+                    'DAYS_UNTIL_STOCKOUT': st.column_config.ProgressColumn(
+                        format="%.1f", min_value=0, max_value=5
+                    )
+                }
+            )
         
         st.markdown("### 📢 Top Priority Actions:")
         top_critical = alerts_df[alerts_df['STOCK_STATUS'] == 'CRITICAL'].head(3)
         
         if len(top_critical) > 0:
-            for idx, row in top_critical.iterrows():
+            for row in top_critical.itertuples(index=False):
                 st.error(f"""
-                **🚨 {row['ITEM']}** at **{row['LOCATION']}**
-                - ⏱️ Only **{row['DAYS_UNTIL_STOCKOUT']:.1f} days** remaining
-                - 📦 Current stock: **{int(row['CLOSING_STOCK'])} units**
-                - 📊 Daily usage: **{row['AVG_DAILY_USAGE']:.0f} units/day**
-                - 🛒 **Suggested order: {int(row['SUGGESTED_REORDER_QTY'])} units**
+                **🚨 {row.ITEM}** at **{row.LOCATION}**
+                - ⏱️ Only **{row.DAYS_UNTIL_STOCKOUT:.1f} days** remaining
+                - 📦 Current stock: **{row.CLOSING_STOCK} units**
+                - 📊 Daily usage: **{row.AVG_DAILY_USAGE:.0f} units/day**
+                - 🛒 **Suggested order: {row.SUGGESTED_REORDER_QTY} units**
                 """)
     else:
         st.success("✅ No critical or warning items! All stock levels are healthy.")
@@ -176,8 +360,7 @@ if page == "📊 Dashboard":
     
     # REORDER LIST
     st.markdown("## 📋 Reorder Priority List")
-    reorder_df = df[df['SUGGESTED_REORDER_QTY'] > 0].copy()
-    reorder_df = reorder_df.sort_values('DAYS_UNTIL_STOCKOUT')
+    reorder_df = actions_df[reorder_mask]
     
     if len(reorder_df) > 0:
         reorder_cols = ['LOCATION', 'ITEM', 'CLOSING_STOCK', 'LEAD_TIME_DAYS',
@@ -188,12 +371,11 @@ if page == "📊 Dashboard":
         col1, col2, col3 = st.columns(3)
         col1.metric("📦 Items to Reorder", len(reorder_df))
         col2.metric("🔢 Total Units", f"{int(reorder_df['SUGGESTED_REORDER_QTY'].sum()):,}")
-        col3.metric("🚨 Critical", len(reorder_df[reorder_df['STOCK_STATUS'] == 'CRITICAL']))
+        col3.metric("🚨 Critical", int(reorder_df['STOCK_STATUS'].eq('CRITICAL').sum()))
         
-        csv = reorder_df[reorder_cols].to_csv(index=False)
         st.download_button(
             label="⬇️ Download Priority List as CSV",
-            data=csv,
+            data=_to_csv_bytes(reorder_df[reorder_cols]),
             file_name=f"reorder_list_{pd.Timestamp.now().strftime('%Y%m%d')}.csv",
             mime="text/csv"
         )
@@ -204,11 +386,40 @@ if page == "📊 Dashboard":
 # PAGE 2: ADD NEW ENTRY
 # ========================================
 elif page == "➕ Add Entry":
+    from datetime import date
     
     st.title("➕ Add New Stock Entry")
     st.markdown("*Add a new daily stock record to the database*")
     st.markdown("---")
     
+    # Batch mode queues entries here and bulk-loads them in one write
+    FLUSH_THRESHOLD = 20
+    if 'pending_rows' not in st.session_state:
+        st.session_state.pending_rows = []
+    
+    # Values are always picked by name so row dict order can't shift columns
+    INSERT_COLUMNS = ('DATE', 'LOCATION', 'ITEM', 'OPENING_STOCK', 'RECEIVED',
+                      'ISSUED', 'CLOSING_STOCK', 'LEAD_TIME_DAYS', 'REORDER_LEVEL')
+    
+    def flush_pending_rows(rows):
+        if len(rows) == 1:
+            insert_query = f"""
+            INSERT INTO daily_stock ({', '.join(INSERT_COLUMNS)})
+            VALUES ({', '.join('?' * len(INSERT_COLUMNS))})
+            """
+            session.sql(insert_query, params=[rows[0][c] for c in INSERT_COLUMNS]).collect()
+        else:
+            # write_pandas stages the frame as Parquet and runs COPY INTO
+            session.write_pandas(
+                pd.DataFrame(rows, columns=list(INSERT_COLUMNS)), "DAILY_STOCK",
+                auto_create_table=False, use_logical_type=True, chunk_size=16000
+            )
+    
+    batch_mode = st.checkbox(
+        "📦 Batch mode",
+        help=f"Queue entries and save them together (auto-saves at {FLUSH_THRESHOLD})"
+    )
+    
     with st.form("add_form"):
         col1, col2 = st.columns(2)
         
@@ -232,29 +443,56 @@ elif page == "➕ Add Entry":
             if not location or not item:
                 st.error("❌ Location and Item are required!")
             else:
+                row = {
+                    'DATE': entry_date, 'LOCATION': location, 'ITEM': item,
+                    'OPENING_STOCK': opening_stock, 'RECEIVED': received,
+                    'ISSUED': issued, 'CLOSING_STOCK': closing_stock,
+                    'LEAD_TIME_DAYS': lead_time, 'REORDER_LEVEL': reorder_level
+                }
                 try:
-                    insert_query = f"""
-                    INSERT INTO daily_stock 
-                    (DATE, LOCATION, ITEM, OPENING_STOCK, RECEIVED, ISSUED, 
-                     CLOSING_STOCK, LEAD_TIME_DAYS, REORDER_LEVEL)
-                    VALUES 
-                    ('{entry_date}', '{location}', '{item}', {opening_stock}, 
-                     {received}, {issued}, {closing_stock}, {lead_time}, {reorder_level})
-                    """
-                    session.sql(insert_query).collect()
-                    
-                    st.success(f"""
-                    ✅ **Entry Added Successfully!**
-                    - Date: {entry_date}
-                    - Location: {location}
-                    - Item: {item}
-                    - Closing Stock: {closing_stock}
-                    
-                    💡 Dynamic Table will update within 1 min.
-                    """)
-                    st.balloons()
+                    if not batch_mode:
+                        flush_pending_rows([row])
+                        
+                        st.success(f"""
+                        ✅ **Entry Added Successfully!**
+                        - Date: {entry_date}
+                        - Location: {location}
+                        - Item: {item}
+                        - Closing Stock: {closing_stock}
+                        
+                        💡 Dynamic Table will update within 1 min.
+                        """)
+                        st.balloons()
+                    else:
+                        st.session_state.pending_rows.append(row)
+                        if len(st.session_state.pending_rows) >= FLUSH_THRESHOLD:
+                            flush_pending_rows(st.session_state.pending_rows)
+                            st.success(f"✅ Saved {len(st.session_state.pending_rows)} queued entries!")
+                            st.session_state.pending_rows = []
+                        else:
+                            st.info(f"📦 Queued {item} at {location}")
                 except Exception as e:
                     st.error(f"❌ Error: {str(e)}")
+    
+    # Result of a manual save, carried across the rerun that clears the queue
+    if 'flush_message' in st.session_state:
+        st.success(st.session_state.pop('flush_message'))
+    
+    pending = st.session_state.pending_rows
+    if pending:
+        st.markdown(f"### 📦 Pending Entries ({len(pending)})")
+        st.dataframe(pd.DataFrame(pending), use_container_width=True)
+        if st.button("💾 Save Pending Entries", type="primary"):
+            try:
+                flush_pending_rows(pending)
+                st.session_state.pending_rows = []
+                st.session_state.flush_message = (
+                    f"✅ Saved {len(pending)} entries! Dynamic Table will update within 1 min."
+                )
+            except Exception as e:
+                st.error(f"❌ Error: {str(e)}")
+            else:
+                st.rerun()
 
 # ========================================
 # PAGE 3: EDIT ENTRY
@@ -265,45 +503,25 @@ elif page == "✏️ Edit Entry":
     st.markdown("*Update stock quantities for an existing record*")
     st.markdown("---")
     
-    # Load recent entries (using * to get all columns regardless of names)
+    # Load recent entries
     try:
-        recent_query = "SELECT * FROM daily_stock ORDER BY date DESC LIMIT 50"
-        recent_df = session.sql(recent_query).to_pandas()
-        
-        # Get actual column names
-        col_names = list(recent_df.columns)
-        st.info(f"📋 Columns found: {', '.join(col_names)}")
-        
+        recent_query = """
+        SELECT date, location, item, opening_stock, received, issued,
+               closing_stock, lead_time_days, reorder_level
+        FROM daily_stock
+        ORDER BY date DESC
+        LIMIT 50
+        """
+        recent_df = fetch_df(recent_query)
     except Exception as e:
         st.error(f"❌ Error loading data: {str(e)}")
         st.stop()
     
     if not recent_df.empty:
-        # DEBUG: Show actual columns
-        st.info(f"🔍 **Columns in daily_stock table:** {', '.join(recent_df.columns)}")
-        
-        # Get actual column names (case-insensitive mapping)
-        cols = {col.upper(): col for col in recent_df.columns}
-        
-        # Map to expected columns with safe fallback
-        date_col = cols.get('DATE', list(recent_df.columns)[0] if len(recent_df.columns) > 0 else 'DATE')
-        location_col = cols.get('LOCATION', list(recent_df.columns)[1] if len(recent_df.columns) > 1 else 'LOCATION')
-        item_col = cols.get('ITEM', list(recent_df.columns)[2] if len(recent_df.columns) > 2 else 'ITEM')
-        opening_col = cols.get('OPENING_STOCK', list(recent_df.columns)[3] if len(recent_df.columns) > 3 else 'OPENING_STOCK')
-        received_col = cols.get('RECEIVED', list(recent_df.columns)[4] if len(recent_df.columns) > 4 else 'RECEIVED')
-        issued_col = cols.get('ISSUED', list(recent_df.columns)[5] if len(recent_df.columns) > 5 else 'ISSUED')
-        closing_col = cols.get('CLOSING_STOCK', list(recent_df.columns)[6] if len(recent_df.columns) > 6 else 'CLOSING_STOCK')
-        lead_col = cols.get('LEAD_TIME_DAYS', list(recent_df.columns)[7] if len(recent_df.columns) > 7 else 'LEAD_TIME_DAYS')
-        reorder_col = cols.get('REORDER_LEVEL', list(recent_df.columns)[8] if len(recent_df.columns) > 8 else 'REORDER_LEVEL')
-        
-        st.success(f"✅ **Using columns:** Date={date_col}, Location={location_col}, Item={item_col}, Received={received_col}")
-        
         st.subheader("Step 1: Select Entry to Edit")
         
-        recent_df['display'] = (
-            recent_df[date_col].astype(str) + " | " + 
-            recent_df[location_col] + " | " + 
-            recent_df[item_col]
+        recent_df['display'] = recent_df['DATE'].astype(str).str.cat(
+            [recent_df['LOCATION'], recent_df['ITEM']], sep=" | "
         )
         
         selected = st.selectbox("Choose entry:", recent_df['display'].tolist())
@@ -316,43 +534,51 @@ elif page == "✏️ Edit Entry":
             col1, col2 = st.columns(2)
             
             with col1:
-                st.markdown(f"**📅 Date:** {selected_row[date_col]}")
-                st.markdown(f"**📍 Location:** {selected_row[location_col]}")
-                st.markdown(f"**💊 Item:** {selected_row[item_col]}")
+                st.markdown(f"**📅 Date:** {selected_row['DATE']}")
+                st.markdown(f"**📍 Location:** {selected_row['LOCATION']}")
+                st.markdown(f"**💊 Item:** {selected_row['ITEM']}")
                 
                 new_opening = st.number_input("Opening Stock", 
-                    value=int(selected_row[opening_col]), min_value=0)
+                    value=int(selected_row['OPENING_STOCK']), min_value=0)
                 new_received = st.number_input("Received", 
-                    value=int(selected_row[received_col]), min_value=0)
+                    value=int(selected_row['RECEIVED']), min_value=0)
             
             with col2:
                 new_issued = st.number_input("Issued", 
-                    value=int(selected_row[issued_col]), min_value=0)
+                    value=int(selected_row['ISSUED']), min_value=0)
                 new_closing = new_opening + new_received - new_issued
                 st.metric("New Closing Stock", new_closing)
                 new_lead = st.number_input("Lead Time", 
-                    value=int(selected_row[lead_col]), min_value=1)
+                    value=int(selected_row['LEAD_TIME_DAYS']), min_value=1)
                 new_reorder = st.number_input("Reorder Level", 
-                    value=int(selected_row[reorder_col]), min_value=0)
+                    value=int(selected_row['REORDER_LEVEL']), min_value=0)
             
             update_btn = st.form_submit_button("💾 Update Entry", use_container_width=True)
             
             if update_btn:
                 try:
-                    # Use actual column names from the table
-                    update_query = f"""
-                    UPDATE daily_stock
-                    SET {opening_col} = {new_opening},
-                        {received_col} = {new_received},
-                        {issued_col} = {new_issued},
-                        {closing_col} = {new_closing},
-                        {lead_col} = {new_lead},
-                        {reorder_col} = {new_reorder}
-                    WHERE {date_col} = '{selected_row[date_col]}'
-                      AND {location_col} = '{selected_row[location_col]}'
-                      AND {item_col} = '{selected_row[item_col]}'
+                    # Single MERGE keyed on (date, location, item)
+                    merge_query = """
+                    MERGE INTO daily_stock t
+                    USING (
+                        SELECT ?::DATE AS date, ? AS location, ? AS item,
+                               ? AS opening_stock, ? AS received, ? AS issued,
+                               ? AS closing_stock, ? AS lead_time_days, ? AS reorder_level
+                    ) s
+                    ON t.date = s.date AND t.location = s.location AND t.item = s.item
+                    WHEN MATCHED THEN UPDATE SET
+                        opening_stock = s.opening_stock,
+                        received = s.received,
+                        issued = s.issued,
+                        closing_stock = s.closing_stock,
+                        lead_time_days = s.lead_time_days,
+                        reorder_level = s.reorder_level
                     """
-                    session.sql(update_query).collect()
+                    session.sql(merge_query, params=[
+                        selected_row['DATE'], selected_row['LOCATION'], selected_row['ITEM'],
+                        new_opening, new_received, new_issued, new_closing,
+                        new_lead, new_reorder
+                    ]).collect()
                     
                     st.success("✅ Entry updated! Dynamic Table will refresh within 1 min.")
                     st.balloons()
@@ -377,7 +603,7 @@ elif page == "🗑️ Delete Entry":
     ORDER BY DATE DESC, LOCATION, ITEM
     LIMIT 50
     """
-    delete_df = session.sql(delete_query).to_pandas()
+    delete_df = fetch_df(delete_query)
     
     if not delete_df.empty:
         # Get actual column names
@@ -387,11 +613,10 @@ elif page == "🗑️ Delete Entry":
         item_col = cols.get('ITEM', 'ITEM')
         closing_col = cols.get('CLOSING_STOCK', 'CLOSING_STOCK')
         
-        delete_df['display'] = (
-            delete_df[date_col].astype(str) + " | " +
-            delete_df[location_col] + " | " +
-            delete_df[item_col] + " | Stock: " +
-            delete_df[closing_col].astype(str)
+        delete_df['display'] = delete_df[date_col].astype(str).str.cat(
+            [delete_df[location_col], delete_df[item_col],
+             "Stock: " + delete_df[closing_col].astype(str)],
+            sep=" | "
         )
         
         selected_delete = st.selectbox("Select entry to delete:", delete_df['display'].tolist())
@@ -412,11 +637,13 @@ elif page == "🗑️ Delete Entry":
             try:
                 delete_sql = f"""
                 DELETE FROM daily_stock
-                WHERE {date_col} = '{delete_row[date_col]}'
-                  AND {location_col} = '{delete_row[location_col]}'
-                  AND {item_col} = '{delete_row[item_col]}'
+                WHERE {date_col} = ?
+                  AND {location_col} = ?
+                  AND {item_col} = ?
                 """
-                session.sql(delete_sql).collect()
+                session.sql(delete_sql, params=[
+                    delete_row[date_col], delete_row[location_col], delete_row[item_col]
+                ]).collect()
                 
                 st.success("✅ Entry deleted! Dynamic Table will update within 1 min.")
             except Exception as e:
@@ -435,77 +662,3 @@ st.markdown("""
     <p>Build With ❤️ By-<b>NEEL SAXENA</b><p>
 </div>
 """, unsafe_allow_html=True)
-
-# ========================================
-# CUSTOM UI STYLING
-# ========================================
-st.markdown("""
-<style>
-
-/* ---- MAIN APP BACKGROUND ---- */
-.stApp {
-    background-color: #f6f8fb;
-    color: #1f2933;
-}
-
-/* ---- SIDEBAR ---- */
-[data-testid="stSidebar"] {
-    background-color: #1e293b;
-    color: white;
-}
-
-[data-testid="stSidebar"] h1,
-[data-testid="stSidebar"] h2,
-[data-testid="stSidebar"] h3,
-[data-testid="stSidebar"] p,
-[data-testid="stSidebar"] label {
-    color: #ffffff !important;
-}
-
-/* ---- HEADINGS ---- */
-h1 {
-    color: #1e3a8a;
-    font-weight: 700;
-}
-h2 {
-    color: #1d4ed8;
-}
-h3 {
-    color: #2563eb;
-}
-
-/* ---- METRIC CARDS ---- */
-[data-testid="stMetric"] {
-    background-color: #ffffff;
-    padding: 12px;
-    border-radius: 10px;
-    box-shadow: 0px 2px 6px rgba(0,0,0,0.08);
-}
-
-/* ---- DATAFRAMES ---- */
-.stDataFrame {
-    background-color: white;
-    border-radius: 8px;
-}
-
-/* ---- BUTTONS ---- */
-.stButton>button {
-    background-color: #2563eb;
-    color: white;
-    border-radius: 8px;
-    padding: 0.6rem 1.2rem;
-    font-weight: 600;
-    border: none;
-}
-
-.stButton>button:hover {
-    background-color: #1d4ed8;
-}
-
-/* ---- SUCCESS / ERROR BOXES ---- */
-.stAlert {
-    border-radius: 8px;
-}
-
-</style>
-""", unsafe_allow_html=True)